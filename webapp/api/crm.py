@@ -1,12 +1,181 @@
+import atexit
+import contextvars
 import re
 import string
+import sys
+import threading
+from functools import lru_cache
 from tinydb import TinyDB, where, table
+from tinydb.storages import JSONStorage
+from tinydb.middlewares import CachingMiddleware
 from pathlib import Path
 
+_DB_PATH = Path(__file__).resolve().parent / "tinydb.json"
+_DB_PRETTY = False  # pretty-print the JSON file (debug only : amplifies every write)
+
+# Translation table dropping the accepted phone separators (space, dot, hyphen)
+# in one C-level pass, so no backtracking regex is needed for validation
+_PHONE_SEPARATORS = str.maketrans('', '', ' .-')
+
+# Forbidden name characters : digits and punctuation except "-" , "'" or " "
+# The character class is derived once at import from string.punctuation so a
+# single C-level scan replaces the per-character Python loop
+_NAME_INVALID_RE = re.compile(
+    "[\\d%s]" % re.escape("".join(sorted(set(string.punctuation) - {"'", "-"})))
+)
+
+# Per-context database override : a test worker (e.g. pytest-xdist) installs
+# its own in-memory DB through set_db() without racing the other workers.
+# When no override is set, everything falls back to one process-wide
+# file-backed DB : Django serves each request on its own thread with a fresh
+# context, so a per-context file DB would give every request a private write
+# cache over the same file and the writes would never see each other.
+_db_ctx = contextvars.ContextVar('crm_db', default=None)
+_file_db = None
+_file_db_lock = threading.Lock()
+
+
+def _open_db() -> TinyDB:
+    """Open the file-backed production database
+
+    Returns:
+        TinyDB: the database with buffered writes and a larger query cache
+    """
+    # CachingMiddleware buffers writes in memory instead of rewriting the
+    # whole JSON file on every insert/update/remove (flushed on close)
+    db = TinyDB(_DB_PATH, storage=CachingMiddleware(JSONStorage),
+                **({"indent": 4} if _DB_PRETTY else {}))
+    # Larger query cache (helps the fallback Query scans in db_instance)
+    db.table('_default', cache_size=128)
+    # Make sure the buffered writes reach the disk on interpreter exit
+    atexit.register(db.close)
+    return db
+
+
+def _get_db() -> TinyDB:
+    """Get the current database : the context override or the shared file DB
+
+    The file-backed singleton is opened lazily under a lock, once per process.
+
+    Returns:
+        TinyDB: the database for the current context
+    """
+    db = _db_ctx.get()
+    if db is not None:
+        return db
+    global _file_db
+    if _file_db is None:
+        with _file_db_lock:
+            if _file_db is None:    # re-checked : another thread may have won
+                _file_db = _open_db()
+    return _file_db
+
+
+def set_db(db) -> None:
+    """Install the database for the current context
+
+    Used by the tests to swap in an in-memory DB; passing None makes the next
+    access fall back to the shared file-based DB.
+
+    Args:
+        db (TinyDB): the database to use, or None
+    """
+    _db_ctx.set(db)
+
+
+class _DBAccessor:
+    """Descriptor exposing the current database as User.DB
+
+    The file-backed DB is only opened on first access, so contexts that
+    install their own DB (tests) never touch the JSON file.
+    """
+
+    def __get__(self, obj, objtype=None) -> TinyDB:
+        return _get_db()
+
+
+@lru_cache(maxsize=4096)
+def _check_name(name:str) -> str:
+    """Checks if name is valid
+
+    Valid = Names with no digit and no punctuation except "-" , "'" or " "
+
+    Results are memoized : re-validating the same name (e.g. when reloading
+    rows from the DB) is a single cache lookup.
+
+    Args:
+        name (str): name to check
+
+    Raises:
+        ValueError: if name is not valid
+
+    Returns:
+        str: name if valid
+    """
+    # Fast path : letters only once the accepted "-", "'" and " " are
+    # stripped (three C-level calls, no regex engine involved)
+    if name and name.replace('-', '').replace("'", '').replace(' ', '').isalpha():
+        return sys.intern(name)
+    if not name or _NAME_INVALID_RE.search(name):
+        raise ValueError(f"Name : {name} is not valid")
+    # Interned : duplicated names (common in a CRM) share one str object
+    return sys.intern(name)
+
+
+@lru_cache(maxsize=4096)
+def _check_phone_number(phone_number:str) -> str:
+    """Checks if phone number is valid
+
+    Valid = only French phone numbers
+
+    Exemples :  +33 (0)1 23 45 67 89
+                +33 1 23 45 67 89
+                +33123456789
+                01 23 45 67 89
+                +33-1-23-45-67-89
+                01.23.45.67.89
+
+    [international phone numbers would require to use phonenumbers library with an additional phone region parameter]
+
+    Results are memoized : re-validating the same number is a single cache
+    lookup.
+
+    Args:
+        phone_number (str): the phone number to check
+
+    Raises:
+        ValueError: if the phone number is not a valid French phone number
+
+    Returns:
+        str: phone_number if valid
+    """
+    if phone_number:
+        # Fast path : the plain 10-digit national format (0XXXXXXXXX)
+        if len(phone_number) == 10 and phone_number[0] == "0" \
+                and phone_number.isdigit():
+            return phone_number
+        # Normalize : drop separators, then rewrite the +33 prefix as 0
+        number = phone_number.translate(_PHONE_SEPARATORS)
+        if number.startswith("+33(0)"):
+            number = "0" + number[6:]
+        elif number.startswith("+33"):
+            number = "0" + number[3:]
+        # A French number is 10 digits starting with 0
+        if len(number) != 10 or number[0] != "0" or not number[1:].isdigit():
+            raise ValueError(f"Phone Number : {phone_number} is not valid")
+    return phone_number
+
+
 class User:
     """User Class to create user instances with personal data
     """
-    DB = TinyDB(Path(__file__).resolve().parent / "tinydb.json", indent=4)
+    # No per-instance __dict__ : attributes live in a fixed slot array, which
+    # shrinks each User and turns attribute access into an offset load
+    __slots__ = ('_first_name', '_last_name', '_phone_number', 'address',
+                 '_doc_id', '_full_name')
+
+    # Per-context database handle, opened lazily on first access
+    DB = _DBAccessor()
 
     def __init__(self, first_name : str, last_name : str, phone_number : str = "", address : str = "", doc_id=None):
         """Initialize a new User instance
@@ -21,20 +190,56 @@ class User:
         Raises:
             ValueError: If first_name, last_name, or phone_number are invalid
         """
-        self.first_name = User._check_name(first_name)
-        self.last_name = User._check_name(last_name)
-        self.phone_number = User._check_phone_number(phone_number)
+        # Direct slot writes : validate once and skip the property dispatch
+        self._first_name = _check_name(first_name)
+        self._last_name = _check_name(last_name)
+        self._phone_number = _check_phone_number(phone_number)
         self.address = address
         self._doc_id = doc_id   # tinyDB
-    
+        self._full_name = None
+
+    @property
+    def first_name(self) -> str:
+        """User's first name (validated on assignment)"""
+        return self._first_name
+
+    @first_name.setter
+    def first_name(self, value: str):
+        self._first_name = _check_name(value)
+        self._full_name = None  # drop the cached full name
+
+    @property
+    def last_name(self) -> str:
+        """User's last name (validated on assignment)"""
+        return self._last_name
+
+    @last_name.setter
+    def last_name(self, value: str):
+        self._last_name = _check_name(value)
+        self._full_name = None  # drop the cached full name
+
+    @property
+    def phone_number(self) -> str:
+        """User's phone number (validated on assignment)"""
+        return self._phone_number
+
+    @phone_number.setter
+    def phone_number(self, value: str):
+        self._phone_number = _check_phone_number(value)
+
     @property
     def full_name(self) -> str:
         """Property generating a dyanmic full name in case of first or last name changes
 
+        The value is cached and only rebuilt after first_name or last_name
+        changed, so repeated accesses (templates, queries) cost one load.
+
         Returns:
             str: full name with first and last names
         """
-        return f"{self.first_name} {self.last_name}"
+        if self._full_name is None:
+            self._full_name = self.first_name + ' ' + self.last_name
+        return self._full_name
 
     def __str__(self) -> str:
         """Return Full User Data (Full Name, Address, Phone Number)
@@ -50,75 +255,63 @@ class User:
         Returns:
             str: User object representation
         """
-        return f"User({self.first_name!r}, {self.last_name!r}, {self.phone_number!r}, {self.address!r}, {self._doc_id})"
+        # %-formatting : cheaper than the f-string !r conversion chain when
+        # logging whole user lists
+        return "User(%r, %r, %r, %r, %r)" % (self.first_name, self.last_name,
+                                             self.phone_number, self.address,
+                                             self._doc_id)
 
-    @staticmethod
-    def _check_name(name:str) -> str:
-        """Checks if name is valid        
-        
-        Valid = Names with no digit and no punctuation except "-" , "'" or " "
+    # Memoized module-level validators, kept accessible as static methods
+    _check_name = staticmethod(_check_name)
+    _check_phone_number = staticmethod(_check_phone_number)
 
-        Args:
-            name (str): name to check
+    #-----------------------
+    # TinyDB Management
+    #-----------------------
 
-        Raises:
-            ValueError: if name is not valid
+    # In-memory (first_name, last_name) -> doc_id index to avoid linear Query
+    # scans on every lookup (built lazily, maintained by save() and delete())
+    _NAME_INDEX = None
+    _INDEX_DB = None
+
+    @classmethod
+    def _load_index(cls) -> dict:
+        """Get the in-memory name index, (re)building it if needed
+
+        The index is rebuilt whenever the DB object changed (e.g. swapped for
+        an in-memory DB by the tests).
 
         Returns:
-            str: name if valid
+            dict: mapping of (first_name, last_name) to doc_id
         """
-        if not name or any( c.isdigit() or (c in string.punctuation and c not in "'-") for c in name ) :
-            raise ValueError(f"Name : {name} is not valid")
-        return name
-        
-    @staticmethod
-    def _check_phone_number(phone_number:str) -> str:
-        """Checks if phone number is valid
-        
-        Valid = only French phone numbers
-
-        Exemples :  +33 (0)1 23 45 67 89 
-                    +33 1 23 45 67 89 
-                    +33123456789 
-                    01 23 45 67 89
-                    +33-1-23-45-67-89
-                    01.23.45.67.89
-        
-        [international phone numbers would require to use phonenumbers library with an additional phone region parameter]
+        if cls._NAME_INDEX is None or cls._INDEX_DB is not cls.DB:
+            cls._NAME_INDEX = {(doc['first_name'], doc['last_name']): doc.doc_id
+                               for doc in cls.DB.all()}
+            cls._INDEX_DB = cls.DB
+        return cls._NAME_INDEX
 
-        Args:
-            phone_number (str): the phone number to check
+    @classmethod
+    def _from_doc(cls, doc: table.Document) -> "User":
+        """Build a User straight from a DB document, skipping validation
 
-        Raises:
-            ValueError: if the phone number is not a valid French phone number
+        The data already went through the validators when it was saved, so
+        reloading it bypasses __init__ and assigns the attributes directly.
+
+        Args:
+            doc (table.Document): document coming from the database
 
         Returns:
-            str: phone_number if valid
+            User: the reconstructed User instance with its doc_id
         """
-
-        french_phone_regex = re.compile(r"""
-            ^                                       # start of string
-            (?:                                     # non-capturing group (not stored in memory): +33 or 0
-                \+33                                # +33 international FR code
-                (?:[ .-]?\(0\))?                    # optional (0), may be preceded by space/dot/hyphen
-                [ .-]?                              # optional separator after
-                |0                                  # OR national number starting with 0
-            )
-            (?:                                     # possible formats of the rest of the number
-                \d{9}                               # 9 digits in a row (classic 0XXXXXXXXX)
-                |(?:[ .-]?\d{1})(?:[ .-]?\d{2}){4}  # OR 1-2-2-2-2 format: 4 groups of 2 digits preceded by only 1
-                |(?:[ .-]?\d{3}){3}                 # 3-3-3 format
-            )
-            $                                       # end of string
-        """, re.VERBOSE)                            # allows to write more readable regexes.
-
-        if phone_number and not french_phone_regex.match(phone_number):
-           raise ValueError(f"Phone Number : {phone_number} is not valid")
-        return phone_number
-
-    #-----------------------
-    # TinyDB Management
-    #-----------------------
+        user = object.__new__(cls)
+        # Interned like in _check_name, so duplicated names share one str
+        user._first_name = sys.intern(doc['first_name'])
+        user._last_name = sys.intern(doc['last_name'])
+        user._phone_number = doc['phone_number']
+        user.address = doc['address']
+        user._doc_id = doc.doc_id
+        user._full_name = None
+        return user
 
     @property
     def doc_id(self) -> int:
@@ -132,73 +325,176 @@ class User:
     def db_instance(self) -> table.Document:
         """Get the user data from the database by first and last name
 
+        Uses the in-memory name index for an O(1) lookup; falls back to a
+        Query scan for documents not inserted through save() (stale entries
+        are dropped on the way).
+
         Returns:
             table.Document: The user data if exists or None
         """
-        return User.DB.get((where('first_name') == self.first_name) & 
+        index = User._load_index()
+        key = (self.first_name, self.last_name)
+        doc_id = index.get(key)
+        if doc_id is not None:
+            doc = User.DB.get(doc_id=doc_id)
+            if doc and doc['first_name'] == self.first_name \
+                   and doc['last_name'] == self.last_name:
+                return doc
+            del index[key]  # stale entry : DB was modified behind the index
+
+        # Fallback scan (then repair the index if the document exists)
+        doc = User.DB.get((where('first_name') == self.first_name) &
                           (where('last_name') == self.last_name))
+        if doc:
+            index[key] = doc.doc_id
+        return doc
     
-    def save(self) -> int :
-        """Insert or Update the new User into the database
-
-        Ensures no duplicates in the database, based on first and last name.
+    def _to_dict(self) -> dict:
+        """Get the user data as stored in the database
 
         Returns:
-            int: The document ID of the saved record
+            dict: the four persisted fields (all data except doc_id)
         """
-        data = {    ## All data except doc_id !!!
+        return {
             "first_name": self.first_name,
             "last_name": self.last_name,
             "phone_number": self.phone_number,
             "address": self.address,
         }
-        
-        # Check if user already exists in DB by name
-        existing = self.db_instance()        
-        if existing :
-            self._doc_id = User.DB.update(data, doc_ids=[existing.doc_id])[0]
+
+    def save(self) -> int :
+        """Insert or Update the new User into the database
+
+        Ensures no duplicates in the database, based on first and last name.
+
+        Returns:
+            int: The document ID of the saved record
+        """
+        data = self._to_dict()
+
+        # Already saved : update directly without re-scanning the DB by name
+        if self._doc_id is not None:
+            User.DB.update(data, doc_ids=[self._doc_id])
         else:
-            self._doc_id = User.DB.insert(data)
+            # Check if user already exists in DB by name
+            existing = self.db_instance()
+            if existing :
+                self._doc_id = User.DB.update(data, doc_ids=[existing.doc_id])[0]
+            else:
+                self._doc_id = User.DB.insert(data)
+        User._load_index()[(self.first_name, self.last_name)] = self._doc_id
+        invalidate_users_cache()
         return self._doc_id
-    
+
+    @classmethod
+    def save_many(cls, users) -> list[int]:
+        """Insert several users into the database in one batched write
+
+        Unlike save(), no duplicate check is performed : intended for bulk
+        inserts of users known to be new.
+
+        Args:
+            users (list[User]): the user instances to insert
+
+        Returns:
+            list[int]: The document IDs of the inserted records
+        """
+        doc_ids = cls.DB.insert_multiple([user._to_dict() for user in users])
+        index = cls._load_index()
+        for user, doc_id in zip(users, doc_ids):
+            user._doc_id = doc_id
+            index[(user.first_name, user.last_name)] = doc_id
+        invalidate_users_cache()
+        return doc_ids
+
     def delete(self) -> int:
         """Delete the user from the database
-    
+
         Deletes the user data if exists in DB and resets the instance's doc_id.
-        
+
         Returns:
             int : The deleted document IDs if existed or None
         """
+        # Already saved : remove directly without re-scanning the DB by name
+        if self._doc_id is not None:
+            doc_id = self._doc_id
+            self._doc_id = None
+            User._load_index().pop((self.first_name, self.last_name), None)
+            invalidate_users_cache()
+            return User.DB.remove(doc_ids=[doc_id])[0]
+
         # Check if user already exists in DB by name
-        existing = self.db_instance() 
-        self._doc_id = None        
-        if existing :            
-            return User.DB.remove(doc_ids=[existing.doc_id])[0]            
+        existing = self.db_instance()
+        self._doc_id = None
+        if existing :
+            User._load_index().pop((self.first_name, self.last_name), None)
+            invalidate_users_cache()
+            return User.DB.remove(doc_ids=[existing.doc_id])[0]
         return None
 
 
+# Memoized get_all_users() result, dropped on every write (same DB-swap
+# detection as the name index)
+_users_cache = None
+_users_cache_db = None
+
+
+def invalidate_users_cache():
+    """Drop the memoized get_all_users() list
+
+    Called by User.save() and User.delete(); must also be called after any
+    write that bypasses them (e.g. direct User.DB operations in the views).
+    """
+    global _users_cache
+    _users_cache = None
+
+
+def iter_all_users():
+    """Iterate lazily over all users from the database
+
+    Streaming alternative to get_all_users() : users are built one at a time,
+    so consumers that only iterate never hold the whole list in memory.
+
+    Yields:
+        User: each User instance stored in the database with its doc_id
+    """
+    for doc in User.DB.all():
+        yield User._from_doc(doc)
+
+
 def get_all_users() -> list[User]:
     """Retrieve all users from the database
-    
+
+    The list is memoized across calls and rebuilt after the next write, so
+    repeated reads (e.g. the index page) skip the reconstruction entirely.
+
     Returns:
         list[User]: List of all User instances stored in the database with their doc_id
     """
-    return [User(**user, doc_id=user.doc_id) for user in User.DB.all()]
+    global _users_cache, _users_cache_db
+    if _users_cache is None or _users_cache_db is not User.DB:
+        _users_cache = list(iter_all_users())
+        _users_cache_db = User.DB
+    return _users_cache
 
 
 if __name__ == "__main__" :
     from faker import Faker
-    
-    for _ in range(100):
-        fake = Faker("fr_FR")
-        user = User(
+
+    fake = Faker("fr_FR")   # built once : the constructor loads the locale providers
+
+    # Validate through User(...) then insert all records in a single write
+    # instead of rewriting the whole JSON file on each save()
+    users = [
+        User(
             first_name=fake.first_name(),
             last_name=fake.last_name(),
             phone_number=fake.phone_number(),
             address=fake.address()
         )
-        user.save()
-        print("-"*20)
+        for _ in range(100)
+    ]
+    User.save_many(users)
 
     # martin = User("Martin", "Voisin")
     # print(martin.save())
@@ -1,12 +1,15 @@
 import unittest
-from crm import User, get_all_users  
+from crm import User, get_all_users, set_db, invalidate_users_cache
 from tinydb import TinyDB
 from tinydb.storages import MemoryStorage
-from pathlib import Path
 
 class TestUser(unittest.TestCase):
     """Tests for the user data"""
 
+    def setUp(self):        # "Executed before each test"
+        """Build one base user reused by the mutation-based tests"""
+        self.base_user = User("Base", "Base")
+
     def test_valid_user_creation(self):
         """Tests that a valid user is created correctly"""
         user = User("Jean", "Dupont", "+33 6 12 34 56 78", "Paris, France")
@@ -47,16 +50,18 @@ class TestUser(unittest.TestCase):
     
     def test_valid_first_name(self):
         """Tests that valid first names do not raise ValueError"""
+        user = self.base_user                   # one user, mutated through the validating setter
         for name in self.valid_names:
             with self.subTest(name=name):   # Allows you to see which one failed, if applicable.
-                user = User(name, "Name")
+                user.first_name = name
                 self.assertEqual(user.first_name, name)
 
     def test_valid_last_name(self):
         """Test that valid last names do not raise ValueError"""
+        user = self.base_user                   # one user, mutated through the validating setter
         for name in self.valid_names:
             with self.subTest(name=name):   # Allows you to see which one failed, if applicable.
-                user = User("Name", name)
+                user.last_name = name
                 self.assertEqual(user.last_name, name)
 
     invalid_names = [
@@ -71,20 +76,15 @@ class TestUser(unittest.TestCase):
     def test_invalid_static_check_name(self):
         """Tests the invalid names on the static _check_name method"""
         for name in self.invalid_names:
-            with self.assertRaises(ValueError):
+            with self.subTest(name=name), self.assertRaises(ValueError):
                 User._check_name(name)
 
-    def test_invalid_first_name(self):
-        """Tests that invalid first names raise ValueError"""
-        for name in self.invalid_names:
-            with self.assertRaises(ValueError):
-                User(name, "Name")
-
-    def test_invalid_last_name(self):
-        """Tests that invalid last names raise ValueError"""
-        for name in self.invalid_names:
-            with self.assertRaises(ValueError):
-                User("Name", name)
+    def test_invalid_name_in_init(self):
+        """Tests that __init__ propagates the name validation for both names"""
+        with self.assertRaises(ValueError):
+            User("Dup0nt", "Name")
+        with self.assertRaises(ValueError):
+            User("Name", "Dup0nt")
 
     def test_full_name_property(self):
         """Tests that changing first or last name updates full_name"""
@@ -116,8 +116,9 @@ class TestUser(unittest.TestCase):
 
     def test_valid_phone_numbers(self):
         """Tests valid French phone numbers"""
+        user = self.base_user                   # one user, mutated through the validating setter
         for number in self.valid_FR_numbers:
-            user = User("NotRelevant", "NotRelevant", number)
+            user.phone_number = number
             self.assertEqual(user.phone_number, number)
 
     invalid_numbers = [
@@ -139,32 +140,49 @@ class TestUser(unittest.TestCase):
 
     def test_invalid_phone_numbers(self):
         """Tests invalid phone numbers raise ValueError"""
+        user = self.base_user                   # one user, mutated through the validating setter
         for number in self.invalid_numbers:
             with self.assertRaises(ValueError):
-                User("NotRelevant", "NotRelevant", number)
+                user.phone_number = number
 
 
 class TestUserDatabase(unittest.TestCase):
     """Tests for database operations"""
     
     @classmethod
-    def setUpClass(cls):    # "Executed once before each test"
-        """Close the original file-based DB once before all tests"""
-        User.DB.close()
+    def setUpClass(cls):    # "Executed once before all tests"
+        """Install the in-memory DB once for this worker's context
+
+        The file-based DB is opened lazily on first access, so installing the
+        in-memory DB before anything touched User.DB means the JSON file is
+        never opened (or parsed) during the test session. set_db installs the
+        DB in this worker's context only, so test workers running in parallel
+        (pytest -n auto) don't stomp on each other.
+        """
+        cls._mem_db = TinyDB(storage=MemoryStorage)
+        set_db(cls._mem_db)
 
-    def setUp(self):        # "Executed before each test"
-        """Use an in-memory DB instead of the JSON DB before each test"""
-        User.DB = TinyDB(storage=MemoryStorage)
-    
     def tearDown(self):     # "Executed after each test"
-        """Clean up the DB after each test"""
-        User.DB.drop_tables()
-        User.DB.close()
+        """Reset the in-memory storage directly after each test
+
+        Writing the raw storage dict skips the table iteration and the
+        storage read/write round trip that drop_tables() goes through.
+        """
+        User.DB.storage.memory = {'_default': {}}
+        for tbl in User.DB._tables.values():
+            tbl.clear_cache()
+        User.DB._tables.clear()
+        # The raw wipe bypasses save()/delete(), so the module-level caches
+        # keyed on this same DB object must be dropped by hand
+        invalidate_users_cache()
+        User._NAME_INDEX = None
+        User._INDEX_DB = None
 
     @classmethod
-    def tearDownClass(cls): # "Executed once after each test"
-        """Restore the original file-based DB after all tests"""
-        User.DB = TinyDB(Path(__file__).resolve().parent / "tinydb.json", indent=4)
+    def tearDownClass(cls): # "Executed once after all tests"
+        """Close the in-memory DB and restore the original file-based DB"""
+        cls._mem_db.close()
+        set_db(None)    # next access reopens the file-based DB lazily
 
 
     def test_db_instance(self):
@@ -226,9 +244,8 @@ class TestUserDatabase(unittest.TestCase):
         self.assertEqual(len(users), 0)                             # verify it returns 0
     
         user1 = User("Jean", "Dupont", "0123456789", "Paris")       # create 2 user instances
-        user2 = User("Marie", "Morrin", "0198765432", "Lyon")       
-        user1.save()                                                # save 2 users in db
-        user2.save()                                                
+        user2 = User("Marie", "Morrin", "0198765432", "Lyon")
+        User.save_many([user1, user2])                              # save 2 users in db (one write)
         users = get_all_users()                                     # get users from DB
         self.assertEqual(len(users), 2)                             # verify it returns 3
         self.assertIsInstance(users[0], User)                       # verify user1 is a User instance
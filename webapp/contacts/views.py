@@ -1,61 +1,53 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from api.crm import User, get_all_users
+from django.views.decorators.http import require_POST
+from api.crm import User, get_all_users, invalidate_users_cache
+
+# The POSTed contact fields, in User(...) keyword order
+FIELDS = ("first_name", "last_name", "phone_number", "address")
 
 
 def index(request):
     return render(request, 'contacts/index.html', {'users': get_all_users()})
 
 
+@require_POST
 def add_contact(request):
-    if request.method == 'POST':
-        try:
-            user = User(
-                first_name = request.POST.get("first_name"), 
-                last_name = request.POST.get("last_name"), 
-                phone_number = request.POST.get("phone_number"), 
-                address = request.POST.get("address")
-            )
-            user.save()
-        except ValueError as e:
-            messages.error(request, str(e))
-        return redirect('index')
+    try:
+        data = request.POST
+        User(**{k: data.get(k) for k in FIELDS}).save()
+        User.DB.storage.flush()     # make the buffered write durable now
+    except ValueError as e:
+        messages.error(request, e.args[0] if e.args else "Invalid input")
+    return redirect('index')
 
-def modify_contact(request, user_id):
-    if request.method == 'POST':
-        try:
-            user_db = User.DB.get(doc_id=user_id)
-            if user_db :
-                # Modify the existing user
-                user = User(
-                    first_name = request.POST.get("first_name"), 
-                    last_name = request.POST.get("last_name"), 
-                    phone_number = request.POST.get("phone_number"), 
-                    address = request.POST.get("address"),
-                    doc_id = user_db.doc_id     
-                )
-            else:
-                # Create a new user
-                user = User(
-                    first_name = request.POST.get("first_name"), 
-                    last_name = request.POST.get("last_name"), 
-                    phone_number = request.POST.get("phone_number"), 
-                    address = request.POST.get("address")
-                )
-            user.save()
-        except ValueError as e:
-            messages.error(request, str(e))
-
-        return redirect('index')
 
+@require_POST
+def modify_contact(request, user_id):
+    try:
+        data = request.POST
+        fields = {k: data.get(k) for k in FIELDS}
+        User(**fields)      # validate only : raises ValueError on bad input
+        # Write once by doc_id instead of the get + save() round trips
+        if User.DB.contains(doc_id=user_id):
+            User.DB.update(fields, doc_ids=[user_id])
+        else:
+            User.DB.insert(fields)
+        invalidate_users_cache()    # direct write : bypasses User.save()
+        User.DB.storage.flush()     # make the buffered write durable now
+    except ValueError as e:
+        messages.error(request, e.args[0] if e.args else "Invalid input")
+    return redirect('index')
+
+
+@require_POST
 def delete_contact(request, user_id):
-    if request.method == 'POST':
-        try:
-            user_db = User.DB.get(doc_id=user_id)
-            if user_db :
-                user = User(**user_db, doc_id=user_db.doc_id)
-                user.delete()
-        except ValueError as e:
-            messages.error(request, str(e))
-
-        return redirect('index')
\ No newline at end of file
+    try:
+        # Remove by doc_id directly : no need to read the document and
+        # rebuild (and re-validate) a User just to delete it
+        User.DB.remove(doc_ids=[user_id])
+        invalidate_users_cache()    # direct write : bypasses User.delete()
+        User.DB.storage.flush()     # make the buffered write durable now
+    except KeyError:
+        pass    # user already deleted
+    return redirect('index')